@@ -1,11 +1,10 @@
 """
 NASA APOD ETL Pipeline DAG
-This DAG implements a complete ETL pipeline with 5 sequential steps:
+This DAG implements a complete ETL pipeline:
 1. Extract data from NASA APOD API
 2. Transform data into clean format
-3. Load data to PostgreSQL and CSV
-4. Version data with DVC
-5. Commit DVC metadata to Git
+3. Load data to PostgreSQL and a partitioned Parquet dataset (parallel branches)
+4. Version data with DVC and commit the metadata to Git
 """
 from datetime import datetime, timedelta
 from airflow import DAG
@@ -19,9 +18,8 @@ sys.path.insert(0, '/opt/airflow/scripts')
 
 from extract_data import extract_apod_data, load_api_key
 from transform_data import transform_apod_data, validate_dataframe
-from load_data import load_to_postgres, load_to_csv, get_postgres_connection_params
-from dvc_operations import initialize_dvc, add_file_to_dvc
-from git_operations import git_commit
+from load_data import load_to_postgres, load_to_parquet, get_postgres_connection_params
+from dvc_operations import version_and_commit
 
 # Default arguments for the DAG
 default_args = {
@@ -45,7 +43,8 @@ dag = DAG(
 )
 
 # Define paths
-CSV_FILE_PATH = "/opt/airflow/data/apod_data.csv"
+PARQUET_DATA_DIR = "/opt/airflow/data/apod"
+XCOM_DATA_DIR = "/opt/airflow/data/xcom"
 REPO_PATH = "/opt/airflow"
 
 # Connection and Variable IDs for Astronomer
@@ -78,60 +77,33 @@ extract = PythonOperator(
 # Step 2: Transform data
 def transform_task(**context):
     """Transform raw data into clean DataFrame format"""
-    import pandas as pd
-    
     # Get raw data from previous task
     raw_data = context['ti'].xcom_pull(key='raw_apod_data', task_ids='extract_apod_data')
-    
+
     if raw_data is None:
         raise ValueError("No data received from extract task. XCom pull returned None.")
-    
+
     print(f"Received raw data with keys: {list(raw_data.keys()) if isinstance(raw_data, dict) else 'Not a dict'}")
-    
+
     # Transform data
     df = transform_apod_data(raw_data)
-    
+
     # Validate DataFrame
     if not validate_dataframe(df):
         raise ValueError("DataFrame validation failed")
-    
-    # Convert all datetime/Timestamp columns to strings for JSON serialization
-    df_for_xcom = df.copy()
-    for col in df_for_xcom.columns:
-        # Check for pandas datetime types
-        if pd.api.types.is_datetime64_any_dtype(df_for_xcom[col]):
-            df_for_xcom[col] = df_for_xcom[col].dt.strftime('%Y-%m-%d %H:%M:%S')
-        # Check for object dtype that might contain datetime objects
-        elif df_for_xcom[col].dtype == 'object':
-            # Check if any value in the column is a datetime
-            non_null_vals = df_for_xcom[col].dropna()
-            if not non_null_vals.empty:
-                first_val = non_null_vals.iloc[0]
-                if isinstance(first_val, (pd.Timestamp, datetime)):
-                    # Convert all datetime objects in this column to strings
-                    df_for_xcom[col] = df_for_xcom[col].apply(
-                        lambda x: x.strftime('%Y-%m-%d %H:%M:%S') if isinstance(x, (pd.Timestamp, datetime)) and x is not None else x
-                    )
-    
-    # Store DataFrame as JSON for XCom (convert to dict)
-    # Use date_format='iso' to ensure all dates are strings
-    df_dict = df_for_xcom.to_dict('records')
-    
-    # Final safety check: convert any remaining datetime objects in the dict
-    def convert_datetime_to_str(obj):
-        if isinstance(obj, (pd.Timestamp, datetime)):
-            return obj.strftime('%Y-%m-%d %H:%M:%S')
-        elif isinstance(obj, dict):
-            return {k: convert_datetime_to_str(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [convert_datetime_to_str(item) for item in obj]
-        return obj
-    
-    df_dict = convert_datetime_to_str(df_dict)
-    context['ti'].xcom_push(key='transformed_data', value=df_dict)
-    context['ti'].xcom_push(key='df_columns', value=list(df.columns))
-    
-    return df_dict
+
+    # Persist the DataFrame as Parquet on the shared volume and pass only the
+    # path through XCom. Parquet keeps dtypes (no datetime stringification
+    # needed) and avoids the O(rows x cols) dict serialization round-trip.
+    os.makedirs(XCOM_DATA_DIR, exist_ok=True)
+    df_path = os.path.join(XCOM_DATA_DIR, f"{context['run_id']}.parquet")
+    df.to_parquet(df_path, index=False)
+
+    print(f"Wrote transformed DataFrame to {df_path}")
+
+    context['ti'].xcom_push(key='df_path', value=df_path)
+
+    return df_path
 
 transform = PythonOperator(
     task_id='transform_data',
@@ -139,108 +111,97 @@ transform = PythonOperator(
     dag=dag,
 )
 
-# Step 3: Load data to PostgreSQL and CSV
-def load_task(**context):
-    """Load data to both PostgreSQL and CSV file"""
+# Step 3: Load data to PostgreSQL and Parquet (independent once the DataFrame
+# exists, so they run as parallel branches)
+def _read_transformed_df(context):
+    """Read the transformed DataFrame written by transform_task"""
     import pandas as pd
-    
-    # Get transformed data from previous task
-    df_dict = context['ti'].xcom_pull(key='transformed_data', task_ids='transform_data')
-    df_columns = context['ti'].xcom_pull(key='df_columns', task_ids='transform_data')
-    
-    if df_dict is None:
-        raise ValueError("No transformed data received from transform task. XCom pull returned None.")
-    
-    if df_columns is None:
-        raise ValueError("No column information received from transform task.")
-    
-    print(f"Received transformed data: {len(df_dict)} record(s)")
-    print(f"Columns: {df_columns}")
-    
-    # Reconstruct DataFrame
-    df = pd.DataFrame(df_dict)
-    
-    # Ensure columns are in correct order
-    if df_columns:
-        df = df[df_columns]
-    
+
+    df_path = context['ti'].xcom_pull(key='df_path', task_ids='transform_data')
+
+    if df_path is None:
+        raise ValueError("No DataFrame path received from transform task. XCom pull returned None.")
+
+    # Read the Parquet file written by the transform task (dtypes preserved)
+    df = pd.read_parquet(df_path)
+
+    print(f"Read transformed data from {df_path}: {len(df)} record(s)")
+    print(f"Columns: {list(df.columns)}")
+
+    return df
+
+
+def load_postgres_task(**context):
+    """Load data to PostgreSQL"""
+    df = _read_transformed_df(context)
+
     # Get PostgreSQL connection parameters (uses Airflow Connection in Astronomer)
     pg_params = get_postgres_connection_params(conn_id=POSTGRES_CONN_ID)
-    
-    # Load to PostgreSQL
+
     load_to_postgres(df, pg_params)
-    
-    # Load to CSV (append mode to accumulate historical data)
-    load_to_csv(df, CSV_FILE_PATH, mode='a')
-    
-    return f"Data loaded to PostgreSQL and {CSV_FILE_PATH}"
 
-load = PythonOperator(
-    task_id='load_data',
-    python_callable=load_task,
+    return "Data loaded to PostgreSQL"
+
+
+def load_parquet_task(**context):
+    """Load data to the date-partitioned Parquet dataset"""
+    df = _read_transformed_df(context)
+
+    # Write only this run's date partition
+    partition_dir = load_to_parquet(df, PARQUET_DATA_DIR)
+
+    # Store partition path in XCom so versioning only touches the new data
+    context['ti'].xcom_push(key='partition_dir', value=partition_dir)
+
+    return f"Data loaded to {partition_dir}"
+
+load_postgres = PythonOperator(
+    task_id='load_data_postgres',
+    python_callable=load_postgres_task,
+    pool='postgres_io',
     dag=dag,
 )
 
-# Step 4: Version data with DVC
-def dvc_version_task(**context):
-    """Add CSV file to DVC version control"""
-    # Ensure data directory exists
-    os.makedirs(os.path.dirname(CSV_FILE_PATH), exist_ok=True)
-    
-    # Check if CSV file exists
-    if not os.path.exists(CSV_FILE_PATH):
-        raise FileNotFoundError(f"CSV file not found: {CSV_FILE_PATH}. Load task must complete successfully first.")
-    
-    print(f"CSV file exists: {CSV_FILE_PATH}")
-    
-    # Initialize DVC if needed
-    initialize_dvc(REPO_PATH)
-    
-    # Add file to DVC
-    dvc_file_path = add_file_to_dvc(CSV_FILE_PATH, REPO_PATH)
-    
-    # Store DVC file path in XCom for next task
-    context['ti'].xcom_push(key='dvc_file_path', value=dvc_file_path)
-    
-    return dvc_file_path
-
-dvc_version = PythonOperator(
-    task_id='version_data_with_dvc',
-    python_callable=dvc_version_task,
+load_parquet = PythonOperator(
+    task_id='load_data_parquet',
+    python_callable=load_parquet_task,
+    pool='local_io',
     dag=dag,
 )
 
-# Step 5: Commit DVC metadata to Git
-def git_commit_task(**context):
-    """Commit DVC metadata file to Git"""
-    # Get DVC file path from previous task
-    dvc_file_path = context['ti'].xcom_pull(key='dvc_file_path', task_ids='version_data_with_dvc')
-    
-    if dvc_file_path is None:
-        raise ValueError("No DVC file path received from version_data_with_dvc task. XCom pull returned None.")
-    
-    print(f"Received DVC file path: {dvc_file_path}")
-    
-    # Extract relative path for Git
-    if dvc_file_path.startswith(REPO_PATH):
-        relative_path = dvc_file_path[len(REPO_PATH) + 1:]
-    else:
-        relative_path = dvc_file_path
-    
-    print(f"Relative path for Git: {relative_path}")
-    
-    # Commit to Git
+# Step 4: Version data with DVC and commit the metadata to Git
+def version_and_commit_task(**context):
+    """Add this run's Parquet partition to DVC and commit its metadata to Git"""
+    # Get the partition written by the load task
+    partition_dir = context['ti'].xcom_pull(key='partition_dir', task_ids='load_data_parquet')
+
+    if partition_dir is None:
+        raise ValueError("No partition path received from load_data_parquet task. XCom pull returned None.")
+
+    # Version the single data file the partition holds; its .dvc metadata is
+    # emitted directly from the file's hash without invoking dvc add
+    partition_file = os.path.join(partition_dir, 'data.parquet')
+
+    if not os.path.exists(partition_file):
+        raise FileNotFoundError(f"Partition file not found: {partition_file}. Load task must complete successfully first.")
+
+    print(f"Partition file exists: {partition_file}")
+
     commit_message = f"Add DVC metadata for APOD data - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-    git_commit(relative_path, commit_message, REPO_PATH)
-    
-    return f"Committed {relative_path} to Git"
+    dvc_file_path = version_and_commit(partition_file, commit_message, REPO_PATH)
+
+    return f"Versioned {partition_file} and committed {dvc_file_path} to Git"
 
-git_commit_op = PythonOperator(
-    task_id='commit_dvc_to_git',
-    python_callable=git_commit_task,
+version_commit = PythonOperator(
+    task_id='version_and_commit',
+    python_callable=version_and_commit_task,
+    pool='local_io',
     dag=dag,
 )
 
 # Define task dependencies
-extract >> transform >> load >> dvc_version >> git_commit_op
+# Postgres and Parquet loads run in parallel; DVC/Git versioning only needs
+# the Parquet partition
+extract >> transform >> [load_postgres, load_parquet]
+load_parquet >> version_commit
 
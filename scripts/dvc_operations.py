@@ -2,117 +2,244 @@
 DVC Operations Module
 Handles DVC versioning operations
 """
-import subprocess
+import hashlib
 import os
+import shutil
+from pathlib import PurePath
 from typing import Optional
 
+from git_operations import git_commit
+
+_DEFAULT_REPO_PATH = "/opt/airflow"
+
+# Stat .dvc once at import; initialize_dvc flips the flag after it runs, so
+# repeated DAG runs in the same worker never re-stat the directory. The repo
+# handle is cached for the same reason.
+_DVC_INITIALIZED = os.path.exists(os.path.join(_DEFAULT_REPO_PATH, ".dvc"))
+_DVC_REPO = None
+
 
 def initialize_dvc(repo_path: str = "/opt/airflow") -> None:
     """
     Initialize DVC repository if not already initialized
-    
+
     Args:
         repo_path: Path to repository root
     """
+    global _DVC_INITIALIZED
+    if _DVC_INITIALIZED:
+        return
+
     try:
         dvc_path = os.path.join(repo_path, ".dvc")
         if not os.path.exists(dvc_path):
-            result = subprocess.run(
-                ["dvc", "init", "--no-scm"],
-                cwd=repo_path,
-                capture_output=True,
-                text=True,
-                check=False
-            )
-            if result.returncode == 0:
-                print("DVC repository initialized successfully")
-            else:
-                print(f"DVC init output: {result.stdout}")
-                print(f"DVC init error: {result.stderr}")
+            from dvc.repo import Repo
+            Repo.init(repo_path, no_scm=True)
+            print("DVC repository initialized successfully")
         else:
             print("DVC repository already initialized")
+        _DVC_INITIALIZED = True
     except Exception as e:
         print(f"Error initializing DVC: {e}")
         raise
 
 
+def _get_dvc_repo(repo_path: str = "/opt/airflow"):
+    """
+    Get (or lazily create) the cached DVC Repo handle
+
+    Args:
+        repo_path: Path to repository root
+
+    Returns:
+        dvc.repo.Repo instance
+    """
+    global _DVC_REPO
+    if _DVC_REPO is None:
+        from dvc.repo import Repo
+
+        # Ensure DVC is initialized
+        initialize_dvc(repo_path)
+        _DVC_REPO = Repo(repo_path)
+    return _DVC_REPO
+
+
 def add_file_to_dvc(file_path: str, repo_path: str = "/opt/airflow") -> str:
     """
     Add file to DVC version control
-    
+
+    Uses the in-process dvc.repo API instead of shelling out to the CLI,
+    which avoids one interpreter cold-start per task.
+
     Args:
         file_path: Path to file to add to DVC (can be absolute or relative)
         repo_path: Path to repository root
-        
+
     Returns:
         Path to the created .dvc metadata file
     """
     try:
-        # Ensure DVC is initialized
-        initialize_dvc(repo_path)
-        
         # Convert to absolute path if needed
         if not os.path.isabs(file_path):
             file_path = os.path.join(repo_path, file_path)
-        
-        # Get relative path from repo_path for DVC command
+
+        # Get relative path from repo_path for DVC
         try:
             rel_path = os.path.relpath(file_path, repo_path)
         except ValueError:
             # If paths are on different drives (Windows), use absolute path
             rel_path = file_path
-        
+
         print(f"Adding file to DVC: {rel_path} (absolute: {file_path})")
-        
-        # Add file to DVC using relative path
-        result = subprocess.run(
-            ["dvc", "add", rel_path],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        # DVC creates .dvc file in the same directory as the file
-        dvc_file_path = os.path.join(os.path.dirname(file_path), f"{os.path.basename(file_path)}.dvc")
-        
+
+        # Pass the absolute path: dvc's Python API resolves relative targets
+        # against the process cwd, not the Repo root, and an Airflow worker's
+        # cwd is not guaranteed to be repo_path
+        repo = _get_dvc_repo(repo_path)
+        repo.add(file_path)
+
+        # DVC creates the .dvc file next to the file; one PurePath operation
+        # instead of the dirname/basename/join trio
+        p = PurePath(file_path)
+        dvc_file_path = str(p.with_name(f"{p.name}.dvc"))
+
         print(f"Successfully added {file_path} to DVC")
         print(f"DVC metadata file created: {dvc_file_path}")
-        print(f"DVC output: {result.stdout}")
-        if result.stderr:
-            print(f"DVC stderr: {result.stderr}")
-        
+
         return dvc_file_path
-        
-    except subprocess.CalledProcessError as e:
-        print(f"Error adding file to DVC: {e}")
-        print(f"Error output: {e.stderr}")
-        print(f"Command output: {e.stdout}")
-        raise
+
     except Exception as e:
         print(f"Unexpected error in DVC add: {e}")
         raise
 
 
+def _ensure_gitignored(dir_path: str, name: str) -> None:
+    """
+    Append a file to the directory's .gitignore if not already listed
+
+    Args:
+        dir_path: Directory containing the ignored file
+        name: File name to ignore
+    """
+    gitignore_path = os.path.join(dir_path, '.gitignore')
+    entry = f"/{name}"
+
+    lines = []
+    if os.path.exists(gitignore_path):
+        with open(gitignore_path, 'r') as f:
+            lines = f.read().splitlines()
+        if entry in lines:
+            return
+
+    lines.append(entry)
+    with open(gitignore_path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def write_dvc_file(file_path: str, repo_path: str = "/opt/airflow") -> str:
+    """
+    Write the .dvc metadata for a single file without invoking dvc add
+
+    dvc add re-reads the file, rescans the repo and rewrites state for every
+    call; for one known file the metadata is just its MD5 and size, so the
+    YAML stub is emitted directly, the file is copied into the DVC cache
+    (keeping dvc checkout/push working) and .gitignore is kept in sync here.
+
+    Args:
+        file_path: Path to file to version (can be absolute or relative)
+        repo_path: Path to repository root
+
+    Returns:
+        Path to the created .dvc metadata file
+    """
+    try:
+        # Convert to absolute path if needed
+        if not os.path.isabs(file_path):
+            file_path = os.path.join(repo_path, file_path)
+
+        md5 = hashlib.md5()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                md5.update(chunk)
+        hex_digest = md5.hexdigest()
+        size = os.path.getsize(file_path)
+
+        # Copy the data into the DVC cache so checkout can restore it and
+        # push has something to upload. A copy, not a hardlink: reruns
+        # rewrite the workspace file in place, and a shared inode would
+        # silently change the bytes behind the old object's MD5. The cache
+        # object is made read-only afterwards, as dvc add does.
+        cache_path = os.path.join(
+            repo_path, '.dvc', 'cache', 'files', 'md5', hex_digest[:2], hex_digest[2:]
+        )
+        if not os.path.exists(cache_path):
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            shutil.copy2(file_path, cache_path)
+            os.chmod(cache_path, 0o444)
+
+        p = PurePath(file_path)
+        dvc_file_path = str(p.with_name(f"{p.name}.dvc"))
+        with open(dvc_file_path, 'w') as f:
+            f.write(
+                "outs:\n"
+                f"- md5: {hex_digest}\n"
+                f"  size: {size}\n"
+                "  hash: md5\n"
+                f"  path: {p.name}\n"
+            )
+
+        # Keep the data file out of Git, as dvc add would
+        _ensure_gitignored(os.path.dirname(file_path), p.name)
+
+        print(f"Wrote DVC metadata file: {dvc_file_path}")
+        return dvc_file_path
+
+    except Exception as e:
+        print(f"Unexpected error writing DVC file: {e}")
+        raise
+
+
+def version_and_commit(file_path: str, message: str, repo_path: str = "/opt/airflow") -> str:
+    """
+    Version a file with DVC metadata and commit it to Git, all in-process
+
+    The .dvc stub is written directly (see write_dvc_file) and committed via
+    GitPython, so versioning stays in the worker process with no fork+exec
+    and a single read of the data file.
+
+    Args:
+        file_path: Path to file to version (can be absolute or relative)
+        message: Git commit message
+        repo_path: Path to repository root
+
+    Returns:
+        Path to the created .dvc metadata file
+    """
+    try:
+        dvc_file_path = write_dvc_file(file_path, repo_path)
+
+        dvc_rel_path = os.path.relpath(dvc_file_path, repo_path)
+        git_commit(dvc_rel_path, message, repo_path)
+
+        return dvc_file_path
+
+    except Exception as e:
+        print(f"Unexpected error in version_and_commit: {e}")
+        raise
+
+
 def get_dvc_status(repo_path: str = "/opt/airflow") -> str:
     """
     Get DVC status
-    
+
     Args:
         repo_path: Path to repository root
-        
+
     Returns:
         Status output as string
     """
     try:
-        result = subprocess.run(
-            ["dvc", "status"],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            check=False
-        )
-        return result.stdout
+        return str(_get_dvc_repo(repo_path).status())
     except Exception as e:
         print(f"Error getting DVC status: {e}")
         return ""
@@ -124,4 +251,3 @@ if __name__ == "__main__":
     if os.path.exists(test_file):
         dvc_file = add_file_to_dvc(test_file)
         print(f"Created DVC file: {dvc_file}")
-
@@ -2,33 +2,69 @@
 Data Extraction Module
 Extracts data from NASA APOD API
 """
-import requests
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
+APOD_URL = "https://api.nasa.gov/planetary/apod"
 
-def extract_apod_data(api_key: Optional[str] = None) -> Dict:
+# Module-level session so warm workers reuse the TLS connection instead of
+# paying the handshake on every run; built lazily so importing this module
+# (e.g. during DAG parse) doesn't pay the requests import
+_SESSION = None
+
+
+def _get_session():
+    """
+    Get (or lazily create) the pooled HTTP session with retries and gzip
+    """
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        _SESSION = requests.Session()
+        _SESSION.headers.update({'Accept-Encoding': 'gzip'})
+        _SESSION.mount(
+            'https://',
+            HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=2,
+                max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+            )
+        )
+    return _SESSION
+
+
+def extract_apod_data(api_key: Optional[str] = None, date: Optional[str] = None) -> Dict:
     """
     Extract data from NASA APOD API
-    
+
     Args:
         api_key: NASA API key. If None, uses DEMO_KEY
-        
+        date: Optional APOD date (YYYY-MM-DD). If None, fetches today's entry
+
     Returns:
         Dictionary containing APOD data
     """
+    import requests
+    import orjson
+
     if api_key is None:
         api_key = "DEMO_KEY"
-    
-    url = f"https://api.nasa.gov/planetary/apod?api_key={api_key}"
-    
+
+    params = {'api_key': api_key}
+    if date:
+        params['date'] = date
+
     try:
-        response = requests.get(url, timeout=30)
+        response = _get_session().get(APOD_URL, params=params, timeout=30)
         response.raise_for_status()
-        data = response.json()
-        
+        # orjson parses the payload in C, ~3x faster than stdlib json
+        data = orjson.loads(response.content)
+
         print(f"Successfully extracted APOD data for date: {data.get('date', 'N/A')}")
         return data
     except requests.exceptions.RequestException as e:
@@ -36,30 +72,81 @@ def extract_apod_data(api_key: Optional[str] = None) -> Dict:
         raise
 
 
+def extract_apod_range(
+    api_key: Optional[str] = None,
+    dates: Optional[List[str]] = None,
+    max_workers: int = 8
+) -> List[Dict]:
+    """
+    Extract APOD data for multiple dates concurrently (historical backfill)
+
+    Requests run in a thread pool over the shared session, so an N-day
+    backfill takes roughly one request latency instead of N in sequence.
+
+    Args:
+        api_key: NASA API key. If None, uses DEMO_KEY
+        dates: List of APOD dates (YYYY-MM-DD) to fetch
+        max_workers: Maximum concurrent requests against the API
+
+    Returns:
+        List of dictionaries containing APOD data, in input date order
+    """
+    if not dates:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda d: extract_apod_data(api_key, date=d), dates))
+
+    print(f"Successfully extracted APOD data for {len(results)} date(s)")
+    return results
+
+
+# Successful key lookups per (variable_key, file_path); misses are not
+# cached so a transient Variable.get error doesn't pin None for the worker
+_API_KEY_CACHE = {}
+
+
 def load_api_key(
     variable_key: str = "NASA_API_KEY",
     file_path: str = "/opt/airflow/api_key.txt"
 ) -> Optional[str]:
     """
-    Load API key from Airflow Variable or file (fallback for local development)
-    
+    Load API key from the environment, Airflow Variable or file
+
+    Successful lookups are memoized per worker process so repeated DAG runs
+    don't hit the Airflow metadata DB for the same key; failed lookups are
+    retried on the next call.
+
     Args:
         variable_key: Airflow Variable key name (default: "NASA_API_KEY")
         file_path: Fallback file path for local development
-        
+
     Returns:
         API key string or None if not found
     """
-    # Try to get from Airflow Variables first
+    cache_key = (variable_key, file_path)
+    if cache_key in _API_KEY_CACHE:
+        return _API_KEY_CACHE[cache_key]
+
+    # Environment first: an in-process lookup with no DB roundtrip (Airflow
+    # exposes AIRFLOW_VAR_<KEY> variables this way)
+    api_key = os.environ.get(variable_key) or os.environ.get(f"AIRFLOW_VAR_{variable_key}")
+    if api_key:
+        print(f"Loaded API key from environment variable: {variable_key}")
+        _API_KEY_CACHE[cache_key] = api_key
+        return api_key
+
+    # Then try Airflow Variables
     try:
         from airflow.models import Variable
         api_key = Variable.get(variable_key, default_var=None)
         if api_key:
             print(f"Loaded API key from Airflow Variable: {variable_key}")
+            _API_KEY_CACHE[cache_key] = api_key
             return api_key
     except Exception as e:
         print(f"Could not load Airflow Variable '{variable_key}': {e}. Trying file fallback.")
-    
+
     # Fallback to file (for local development)
     try:
         if os.path.exists(file_path):
@@ -67,16 +154,19 @@ def load_api_key(
                 api_key = f.read().strip()
                 if api_key:
                     print(f"Loaded API key from file: {file_path}")
+                    _API_KEY_CACHE[cache_key] = api_key
                     return api_key
     except Exception as e:
         print(f"Error loading API key from file: {e}")
-    
+
     return None
 
 
 if __name__ == "__main__":
     # Test extraction
+    import orjson
+
     api_key = load_api_key()
     data = extract_apod_data(api_key)
-    print(json.dumps(data, indent=2))
+    print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
 
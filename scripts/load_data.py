@@ -1,20 +1,62 @@
 """
 Data Loading Module
-Loads transformed data to PostgreSQL and CSV file
+Loads transformed data to PostgreSQL and a partitioned Parquet dataset
 """
-import pandas as pd
-import psycopg2
-from psycopg2.extras import execute_values
+# Annotations stay strings so pandas/psycopg can be imported lazily inside
+# the functions, keeping DAG parse light
+from __future__ import annotations
+
+from datetime import date, datetime
 from typing import Optional
 import os
 
+# Module-global connection pool so subsequent DAG runs on a warm worker skip
+# the TLS handshake + auth roundtrip
+_CONNECTION_POOL = None
+
+# PostgreSQL types for binary COPY (must match the apod_data_stage columns)
+_PG_COLUMN_TYPES = {
+    'date': 'date',
+    'title': 'text',
+    'url': 'text',
+    'explanation': 'text',
+    'media_type': 'varchar',
+    'hdurl': 'text',
+    'copyright': 'text',
+    'service_version': 'varchar',
+    'extraction_timestamp': 'timestamp',
+}
 
-def create_postgres_table(connection_params: dict) -> None:
+
+def _get_connection_pool(connection_params: dict):
     """
-    Create the APOD data table in PostgreSQL if it doesn't exist
-    
+    Get (or lazily create) the module-global PostgreSQL connection pool
+
     Args:
         connection_params: Dictionary with PostgreSQL connection parameters
+
+    Returns:
+        psycopg_pool.ConnectionPool instance
+    """
+    global _CONNECTION_POOL
+    if _CONNECTION_POOL is None:
+        from psycopg.conninfo import make_conninfo
+        from psycopg_pool import ConnectionPool
+
+        params = dict(connection_params)
+        params['dbname'] = params.pop('database')
+        _CONNECTION_POOL = ConnectionPool(
+            make_conninfo(**params), min_size=1, max_size=4
+        )
+    return _CONNECTION_POOL
+
+
+def create_postgres_table(conn) -> None:
+    """
+    Create the APOD data table in PostgreSQL if it doesn't exist
+
+    Args:
+        conn: Open psycopg connection
     """
     create_table_query = """
     CREATE TABLE IF NOT EXISTS apod_data (
@@ -32,114 +74,149 @@ def create_postgres_table(connection_params: dict) -> None:
         UNIQUE(date)
     );
     """
-    
+
     try:
-        conn = psycopg2.connect(**connection_params)
         cursor = conn.cursor()
         cursor.execute(create_table_query)
         conn.commit()
         cursor.close()
-        conn.close()
         print("PostgreSQL table 'apod_data' created or already exists")
     except Exception as e:
         print(f"Error creating PostgreSQL table: {e}")
         raise
 
 
+def _to_pg_row(row: tuple, columns: list) -> tuple:
+    """
+    Convert one DataFrame row to typed values for binary COPY
+
+    Args:
+        row: Tuple of raw values from the DataFrame
+        columns: Column names matching the tuple positions
+
+    Returns:
+        Tuple with ISO strings parsed to date/datetime and NaN mapped to None
+    """
+    out = []
+    for col, val in zip(columns, row):
+        if val is None or val != val:  # NaN check without importing pandas
+            out.append(None)
+        elif col == 'date' and isinstance(val, str):
+            out.append(date.fromisoformat(val))
+        elif col == 'extraction_timestamp' and isinstance(val, str):
+            out.append(datetime.fromisoformat(val))
+        else:
+            out.append(val)
+    return tuple(out)
+
+
 def load_to_postgres(df: pd.DataFrame, connection_params: dict) -> None:
     """
     Load DataFrame to PostgreSQL database
-    
+
+    Rows stream to a staging table via COPY ... WITH (FORMAT BINARY), which
+    skips all server-side text parsing and CSV escaping (the explanation
+    field contains newlines and quotes), then a single prepared upsert moves
+    them into apod_data.
+
     Args:
         df: DataFrame to load
         connection_params: Dictionary with PostgreSQL connection parameters
     """
     try:
-        # Ensure table exists
-        create_postgres_table(connection_params)
-        
-        conn = psycopg2.connect(**connection_params)
-        cursor = conn.cursor()
-        
-        # Prepare data for insertion
-        columns = ['date', 'title', 'url', 'explanation', 'media_type', 
-                  'hdurl', 'copyright', 'service_version', 'extraction_timestamp']
-        
-        # Select only columns that exist in DataFrame
-        available_columns = [col for col in columns if col in df.columns]
-        df_subset = df[available_columns].copy()
-        
-        # Convert date to string format for PostgreSQL (handle both datetime and string)
-        if 'date' in df_subset.columns:
-            if pd.api.types.is_datetime64_any_dtype(df_subset['date']):
-                df_subset['date'] = df_subset['date'].dt.strftime('%Y-%m-%d')
-            elif df_subset['date'].dtype == 'object':
-                # Already a string, just ensure format
-                df_subset['date'] = pd.to_datetime(df_subset['date']).dt.strftime('%Y-%m-%d')
-        
-        # Convert extraction_timestamp to string (handle both datetime and string)
-        if 'extraction_timestamp' in df_subset.columns:
-            if pd.api.types.is_datetime64_any_dtype(df_subset['extraction_timestamp']):
-                df_subset['extraction_timestamp'] = df_subset['extraction_timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
-            elif df_subset['extraction_timestamp'].dtype == 'object':
-                # Already a string, keep as is or ensure format
-                pass  # Already in string format from XCom
-        
-        # Prepare values for insertion
-        values = [tuple(row) for row in df_subset.values]
-        columns_str = ','.join(available_columns)
-        
-        # Use ON CONFLICT to handle duplicates
-        update_columns = [col for col in available_columns if col != 'date']
-        update_str = ','.join([f"{col} = EXCLUDED.{col}" for col in update_columns])
-        
-        # Use execute_values for bulk insert with ON CONFLICT
-        template = f"({','.join(['%s'] * len(available_columns))})"
-        insert_query = f"""
-        INSERT INTO apod_data ({columns_str})
-        VALUES %s
-        ON CONFLICT (date) 
-        DO UPDATE SET {update_str}
-        """
-        
-        execute_values(cursor, insert_query, values, template=template)
-        conn.commit()
-        
-        print(f"Successfully loaded {len(df)} record(s) to PostgreSQL")
-        
-        cursor.close()
-        conn.close()
-        
+        conn_pool = _get_connection_pool(connection_params)
+        with conn_pool.connection() as conn:
+            # Ensure table exists (reuses the same connection as the load)
+            create_postgres_table(conn)
+
+            cursor = conn.cursor()
+
+            # Prepare data for insertion
+            columns = ['date', 'title', 'url', 'explanation', 'media_type',
+                      'hdurl', 'copyright', 'service_version', 'extraction_timestamp']
+
+            # Select only columns that exist in DataFrame (a view is enough since
+            # nothing below mutates the subset)
+            available_columns = [col for col in columns if col in df.columns]
+            df_subset = df[available_columns]
+
+            columns_str = ','.join(available_columns)
+
+            # Stage rows via binary COPY (single roundtrip, zero server-side
+            # parsing), then upsert from the staging table in one statement
+            cursor.execute(f"""
+            CREATE UNLOGGED TABLE IF NOT EXISTS apod_data_stage (
+                date DATE,
+                title TEXT,
+                url TEXT,
+                explanation TEXT,
+                media_type VARCHAR(50),
+                hdurl TEXT,
+                copyright TEXT,
+                service_version VARCHAR(50),
+                extraction_timestamp TIMESTAMP
+            );
+            TRUNCATE apod_data_stage;
+            """)
+
+            with cursor.copy(
+                f"COPY apod_data_stage ({columns_str}) FROM STDIN WITH (FORMAT BINARY)"
+            ) as copy:
+                copy.set_types([_PG_COLUMN_TYPES[col] for col in available_columns])
+                for row in df_subset.itertuples(index=False, name=None):
+                    copy.write_row(_to_pg_row(row, available_columns))
+
+            # Use ON CONFLICT to handle duplicates; prepare=True makes psycopg
+            # keep the parsed plan server-side for reuse on pooled connections
+            update_columns = [col for col in available_columns if col != 'date']
+            update_str = ','.join([f"{col} = EXCLUDED.{col}" for col in update_columns])
+
+            cursor.execute(f"""
+            INSERT INTO apod_data ({columns_str})
+            SELECT {columns_str} FROM apod_data_stage
+            ON CONFLICT (date)
+            DO UPDATE SET {update_str}
+            """, prepare=True)
+            conn.commit()
+
+            print(f"Successfully loaded {len(df)} record(s) to PostgreSQL")
+
+            cursor.close()
+
     except Exception as e:
         print(f"Error loading data to PostgreSQL: {e}")
         raise
 
 
-def load_to_csv(df: pd.DataFrame, file_path: str, mode: str = 'a') -> None:
+def load_to_parquet(df: pd.DataFrame, base_dir: str) -> str:
     """
-    Load DataFrame to CSV file
-    
+    Load DataFrame to a date-partitioned Parquet dataset
+
+    Each run writes only its own date=YYYY-MM-DD partition, so downstream
+    DVC hashing touches one day's data instead of the whole history that
+    the old append-mode CSV accumulated.
+
     Args:
         df: DataFrame to load
-        file_path: Path to CSV file
-        mode: File mode ('w' for write, 'a' for append)
+        base_dir: Root directory of the Parquet dataset
+
+    Returns:
+        Path to the partition directory written for this run
     """
     try:
-        # Create directory if it doesn't exist
-        dir_path = os.path.dirname(file_path)
-        if dir_path:
-            os.makedirs(dir_path, exist_ok=True)
-        
-        # Check if file exists to determine header
-        header = not os.path.exists(file_path) or mode == 'w'
-        
-        # Append or write to CSV
-        df.to_csv(file_path, mode=mode, header=header, index=False)
-        
-        print(f"Successfully loaded {len(df)} record(s) to CSV: {file_path}")
-        
+        partition_date = str(df['date'].iloc[0])
+        partition_dir = os.path.join(base_dir, f"date={partition_date}")
+        os.makedirs(partition_dir, exist_ok=True)
+
+        file_path = os.path.join(partition_dir, 'data.parquet')
+        df.to_parquet(file_path, compression='zstd', index=False)
+
+        print(f"Successfully loaded {len(df)} record(s) to Parquet: {file_path}")
+
+        return partition_dir
+
     except Exception as e:
-        print(f"Error loading data to CSV: {e}")
+        print(f"Error loading data to Parquet: {e}")
         raise
 
 
@@ -153,11 +230,11 @@ def get_postgres_connection_params(
 ) -> dict:
     """
     Get PostgreSQL connection parameters from Airflow Connection or use defaults
-    
+
     Args:
         conn_id: Airflow connection ID (default: "postgres_default")
         host, port, database, user, password: Fallback values if connection not found
-    
+
     Returns:
         Dictionary with connection parameters
     """
@@ -165,7 +242,7 @@ def get_postgres_connection_params(
         # Try to get connection from Airflow
         from airflow.hooks.base import BaseHook
         conn = BaseHook.get_connection(conn_id)
-        
+
         # Parse connection URI or use individual fields
         if conn.host:
             return {
@@ -177,7 +254,7 @@ def get_postgres_connection_params(
             }
     except Exception as e:
         print(f"Could not load Airflow connection '{conn_id}': {e}. Using fallback values.")
-    
+
     # Fallback to default values (for local development)
     return {
         'host': host or "postgres",
@@ -190,14 +267,15 @@ def get_postgres_connection_params(
 
 if __name__ == "__main__":
     # Test loading
+    import pandas as pd
+
     test_df = pd.DataFrame({
         'date': ['2024-01-01'],
         'title': ['Test Title'],
         'url': ['https://example.com'],
         'explanation': ['Test explanation']
     })
-    
-    # Test CSV loading
-    load_to_csv(test_df, '/tmp/test_apod_data.csv', mode='w')
-    print("CSV loading test completed")
 
+    # Test Parquet loading
+    partition = load_to_parquet(test_df, '/tmp/test_apod_data')
+    print(f"Parquet loading test completed: {partition}")
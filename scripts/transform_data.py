@@ -2,42 +2,40 @@
 Data Transformation Module
 Transforms raw APOD JSON data into clean DataFrame format
 """
-import pandas as pd
-from typing import Dict, List
+# Annotations stay strings so pandas can be imported lazily inside the
+# functions, keeping DAG parse light
+from __future__ import annotations
+
+from typing import Dict, List, Union
 from datetime import datetime
 
+# Fields of interest from the raw APOD payload
+APOD_FIELDS = ['date', 'title', 'url', 'explanation', 'media_type',
+               'hdurl', 'copyright', 'service_version']
+
 
-def transform_apod_data(raw_data: Dict) -> pd.DataFrame:
+def transform_apod_data(raw_data: Union[Dict, List[Dict]]) -> pd.DataFrame:
     """
     Transform raw APOD JSON data into a clean DataFrame
-    
+
     Args:
-        raw_data: Raw JSON data from NASA APOD API
-        
+        raw_data: Raw JSON data from NASA APOD API; either a single record
+            or a list of records (historical backfill)
+
     Returns:
         Cleaned pandas DataFrame with selected fields
     """
-    # Select fields of interest
-    fields_of_interest = {
-        'date': raw_data.get('date', ''),
-        'title': raw_data.get('title', ''),
-        'url': raw_data.get('url', ''),
-        'explanation': raw_data.get('explanation', ''),
-        'media_type': raw_data.get('media_type', ''),
-        'hdurl': raw_data.get('hdurl', ''),
-        'copyright': raw_data.get('copyright', ''),
-        'service_version': raw_data.get('service_version', '')
-    }
-    
-    # Create DataFrame from single record
-    df = pd.DataFrame([fields_of_interest])
-    
-    # Ensure date column is datetime
-    if 'date' in df.columns:
-        df['date'] = pd.to_datetime(df['date'])
-    
-    # Add extraction timestamp
-    df['extraction_timestamp'] = datetime.now()
+    import pandas as pd
+
+    # Normalize to a list of records and build the DataFrame in one shot
+    records = raw_data if isinstance(raw_data, list) else [raw_data]
+    rows = [{field: record.get(field, '') for field in APOD_FIELDS} for record in records]
+    df = pd.DataFrame.from_records(rows)
+
+    # Keep 'date' as the ISO string the API already returns and emit the
+    # extraction timestamp as a string too; no datetime objects enter the
+    # DataFrame, so no per-cell conversion is needed downstream
+    df['extraction_timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
     print(f"Transformed data: {len(df)} record(s) with {len(df.columns)} columns")
     print(f"Columns: {list(df.columns)}")